@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+sync_all.py - amplifier-coreとDDDコレクションをまとめて同期
+
+2つの上流リポジトリのクローンを並列に実行し、その後各同期処理を順番に行う。
+
+Usage:
+    python scripts/sync_all.py [--dry-run]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import sync_amplifier_core
+import sync_ddd
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync amplifier-core docs and DDD collection")
+    parser.add_argument("--dry-run", action="store_true", help="Show changes without applying")
+    parser.add_argument(
+        "--use-mirror",
+        action="store_true",
+        help=f"Reuse objects from a local mirror under {sync_amplifier_core.CACHE_DIR}",
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Amplifier Core + DDD Collection Sync")
+    print("=" * 60)
+
+    # 一時ディレクトリに並列クローン（いずれもネットワーク待ちなのでスレッドで十分）
+    with tempfile.TemporaryDirectory() as core_tmp, tempfile.TemporaryDirectory() as ddd_tmp:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            core_future = executor.submit(
+                sync_amplifier_core.clone_upstream,
+                Path(core_tmp) / "amplifier-core",
+                use_mirror=args.use_mirror,
+            )
+            ddd_future = executor.submit(
+                sync_ddd.clone_upstream, Path(ddd_tmp) / "ddd", use_mirror=args.use_mirror
+            )
+            core_dir = core_future.result()
+            ddd_dir = ddd_future.result()
+
+        print("\n[1/5] Syncing amplifier-philosophy...")
+        sync_amplifier_core.sync_philosophy(core_dir, dry_run=args.dry_run)
+
+        print("\n[2/5] Syncing module-development...")
+        sync_amplifier_core.sync_module_development(core_dir, dry_run=args.dry_run)
+
+        print("\n[3/5] Converting agents to commands...")
+        sync_ddd.convert_agents_to_commands(ddd_dir, dry_run=args.dry_run)
+
+        print("\n[4/5] Copying context to skills...")
+        sync_ddd.copy_context_to_skills(ddd_dir, dry_run=args.dry_run)
+
+        print("\n[5/5] Generating SKILL.md...")
+        sync_ddd.generate_skill_md(dry_run=args.dry_run)
+
+    print("\n" + "=" * 60)
+    if args.dry_run:
+        print("DRY-RUN complete. No files were modified.")
+    else:
+        print("Sync complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,16 +9,23 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import os
 import re
 import subprocess
 import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 
 # === 設定 ===
 SOURCE_REPO = "https://github.com/microsoft/amplifier-core"
+# 同期で参照する上流のパス（これ以外はチェックアウトしない）
+SOURCE_PATHS = ["docs"]
 PLUGIN_ROOT = Path(__file__).parent.parent
 
-# 参照パス変換ルール
+# 上流リポジトリのミラーを保持するキャッシュディレクトリ
+CACHE_DIR = Path.home() / ".cache" / "amplifier-skills-plugin"
+
+# 参照パス変換ルール（上から順に優先）
 REFERENCE_PATTERNS = [
     # amplifier-core内の参照をスキル参照に変換
     (r"\[([^\]]+)\]\(DESIGN_PHILOSOPHY\.md\)", r"[\1](@skills/amplifier-philosophy/SKILL.md)"),
@@ -28,6 +35,29 @@ REFERENCE_PATTERNS = [
     (r"\[([^\]]+)\]\(\.\./([^)]+)\)", r"[\1](https://github.com/microsoft/amplifier-core/blob/main/\2)"),
 ]
 
+# 参照変換ルールが反応しうる部分文字列（いずれかを含まない文書は変換不要）
+REFERENCE_MARKERS = ("](DESIGN_PHILOSOPHY.md)", "](contracts/", "](MODULE_SOURCE_PROTOCOL.md)", "](../")
+
+
+def _fuse_patterns(patterns: list[tuple[str, str]]) -> tuple[re.Pattern[str], dict[str, str]]:
+    """変換ルールを名前付きグループの選択（|）に統合し、1回の走査で置換できるようにする"""
+    alternatives = []
+    replacements = {}
+    group_index = 1
+    for i, (pattern, replacement) in enumerate(patterns):
+        name = f"g{i}"
+        # 統合後の絶対グループ番号に合わせて後方参照（\1 など）を振り直す
+        offset = group_index
+        replacements[name] = re.sub(
+            r"\\(\d+)", lambda m: f"\\g<{int(m.group(1)) + offset}>", replacement
+        )
+        alternatives.append(f"(?P<{name}>{pattern})")
+        group_index += 1 + re.compile(pattern).groups
+    return re.compile("|".join(alternatives)), replacements
+
+
+_FUSED_PATTERN, _REPLACEMENTS = _fuse_patterns(REFERENCE_PATTERNS)
+
 CREDIT_COMMENT = """\
 <!--
   Source: https://github.com/microsoft/amplifier-core
@@ -65,6 +95,9 @@ metadata:
 
 """
 
+# module-development/SKILL.md 内のセクション区切り
+SECTION_SEPARATOR = "\n\n---\n\n"
+
 # contracts統合の順序
 CONTRACT_FILES = [
     "TOOL_CONTRACT.md",
@@ -75,23 +108,72 @@ CONTRACT_FILES = [
 ]
 
 
-def clone_upstream(target_dir: Path) -> Path:
-    """ソースリポジトリをクローン"""
+def ensure_mirror(url: str) -> Path | None:
+    """ローカルのミラーを作成・更新（失敗した場合は None を返し、ミラーなしでクローンさせる）"""
+    mirror_dir = CACHE_DIR / f"{url.rstrip('/').rsplit('/', 1)[-1]}.git"
+    try:
+        if mirror_dir.exists():
+            print(f"Updating mirror {mirror_dir}...")
+            subprocess.run(
+                ["git", "--git-dir", str(mirror_dir), "remote", "update", "--prune"],
+                check=True,
+                capture_output=True,
+            )
+        else:
+            print(f"Creating mirror {mirror_dir}...")
+            mirror_dir.parent.mkdir(parents=True, exist_ok=True)
+            subprocess.run(
+                ["git", "clone", "--mirror", url, str(mirror_dir)],
+                check=True,
+                capture_output=True,
+            )
+    except subprocess.CalledProcessError as e:
+        print(f"  WARNING: Mirror update failed, cloning without it: {e.stderr.decode().strip()}")
+        print(f"  (Delete {mirror_dir} if this keeps happening)")
+        return None
+    return mirror_dir
+
+
+def clone_upstream(target_dir: Path, use_mirror: bool = False) -> Path:
+    """ソースリポジトリをクローン（use_mirror=True ならローカルミラーのオブジェクトを再利用）"""
+    mirror_dir = ensure_mirror(SOURCE_REPO) if use_mirror else None
+    reference_args = ["--reference-if-able", str(mirror_dir)] if mirror_dir else []
     print(f"Cloning {SOURCE_REPO}...")
     subprocess.run(
-        ["git", "clone", "--depth", "1", SOURCE_REPO, str(target_dir)],
+        [
+            "git", "clone",
+            "--depth", "1",
+            "--single-branch",
+            "--no-tags",
+            "--filter=tree:0",
+            *reference_args,
+            "--sparse",
+            "--no-checkout",
+            SOURCE_REPO, str(target_dir),
+        ],
         check=True,
         capture_output=True,
     )
+    # sparse-checkout で同期に必要なパスだけを展開（それ以外のツリー・blobは取得しない）
+    for command in (["sparse-checkout", "set", *SOURCE_PATHS], ["checkout"]):
+        subprocess.run(
+            ["git", "-C", str(target_dir), *command],
+            check=True,
+            capture_output=True,
+        )
     return target_dir
 
 
+def _dispatch_replacement(match: re.Match[str]) -> str:
+    """マッチしたルールの置換テンプレートを展開"""
+    return match.expand(_REPLACEMENTS[match.lastgroup])
+
+
 def transform_references(content: str) -> str:
     """参照パスを変換"""
-    result = content
-    for pattern, replacement in REFERENCE_PATTERNS:
-        result = re.sub(pattern, replacement, result)
-    return result
+    if not any(marker in content for marker in REFERENCE_MARKERS):
+        return content
+    return _FUSED_PATTERN.sub(_dispatch_replacement, content)
 
 
 def inject_credit(content: str) -> str:
@@ -99,6 +181,17 @@ def inject_credit(content: str) -> str:
     return CREDIT_COMMENT + content
 
 
+def _write_bytes(path: Path, data: bytes) -> None:
+    """os.open/os.write で直接書き込み（TextIOWrapper を経由しない）"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
 def sync_philosophy(source_dir: Path, dry_run: bool = False) -> Path:
     """DESIGN_PHILOSOPHY.md → amplifier-philosophy/SKILL.md"""
     source_path = source_dir / "docs" / "DESIGN_PHILOSOPHY.md"
@@ -115,39 +208,30 @@ def sync_philosophy(source_dir: Path, dry_run: bool = False) -> Path:
         print(f"  [DRY-RUN] Would update: {target_path}")
     else:
         target_path.parent.mkdir(parents=True, exist_ok=True)
-        target_path.write_text(content)
+        _write_bytes(target_path, content.encode("utf-8"))
         print(f"  Updated: {target_path}")
 
     return target_path
 
 
-def sync_module_development(source_dir: Path, dry_run: bool = False) -> Path:
-    """contracts/*.md + MODULE_SOURCE_PROTOCOL.md → module-development/SKILL.md"""
+def iter_module_development_sections(source_dir: Path) -> Iterator[str]:
+    """module-development/SKILL.md の内容を先頭から順に生成"""
     contracts_dir = source_dir / "docs" / "contracts"
-    target_path = PLUGIN_ROOT / "skills" / "module-development" / "SKILL.md"
-
-    if not contracts_dir.exists():
-        raise FileNotFoundError(f"Contracts directory not found: {contracts_dir}")
-
-    # README.mdを概要として使用
-    readme_path = contracts_dir / "README.md"
-    if not readme_path.exists():
-        raise FileNotFoundError(f"README not found: {readme_path}")
 
-    sections = []
+    yield MODULE_DEV_FRONTMATTER
+    yield CREDIT_COMMENT
 
     # 概要（README.md）
-    readme_content = readme_path.read_text()
-    readme_content = transform_references(readme_content)
-    sections.append(readme_content)
+    readme_content = (contracts_dir / "README.md").read_text()
+    yield transform_references(readme_content)
 
     # 各契約ファイル
     for contract_file in CONTRACT_FILES:
         contract_path = contracts_dir / contract_file
         if contract_path.exists():
             contract_content = contract_path.read_text()
-            contract_content = transform_references(contract_content)
-            sections.append(f"\n---\n\n{contract_content}")
+            yield SECTION_SEPARATOR
+            yield transform_references(contract_content)
         else:
             print(f"  WARNING: Contract file not found: {contract_path}")
 
@@ -155,20 +239,38 @@ def sync_module_development(source_dir: Path, dry_run: bool = False) -> Path:
     module_source_path = source_dir / "docs" / "MODULE_SOURCE_PROTOCOL.md"
     if module_source_path.exists():
         module_source_content = module_source_path.read_text()
-        module_source_content = transform_references(module_source_content)
-        sections.append(f"\n---\n\n# Appendix: Module Source Protocol\n\n{module_source_content}")
+        yield SECTION_SEPARATOR
+        yield "# Appendix: Module Source Protocol\n\n"
+        yield transform_references(module_source_content)
     else:
         print(f"  WARNING: MODULE_SOURCE_PROTOCOL.md not found")
 
-    # 統合
-    combined_content = "\n".join(sections)
-    combined_content = MODULE_DEV_FRONTMATTER + inject_credit(combined_content)
+
+def sync_module_development(source_dir: Path, dry_run: bool = False) -> Path:
+    """contracts/*.md + MODULE_SOURCE_PROTOCOL.md → module-development/SKILL.md"""
+    contracts_dir = source_dir / "docs" / "contracts"
+    target_path = PLUGIN_ROOT / "skills" / "module-development" / "SKILL.md"
+
+    if not contracts_dir.exists():
+        raise FileNotFoundError(f"Contracts directory not found: {contracts_dir}")
+
+    # README.mdを概要として使用
+    readme_path = contracts_dir / "README.md"
+    if not readme_path.exists():
+        raise FileNotFoundError(f"README not found: {readme_path}")
+
+    sections = iter_module_development_sections(source_dir)
 
     if dry_run:
+        # 書き込みはしないが、変換と警告表示は通常実行と同じく行う
+        for _ in sections:
+            pass
         print(f"  [DRY-RUN] Would update: {target_path}")
     else:
+        # 結合済みの全文を持たず、セクションごとにファイルへ書き出す
         target_path.parent.mkdir(parents=True, exist_ok=True)
-        target_path.write_text(combined_content)
+        with target_path.open("w", encoding="utf-8") as f:
+            f.writelines(sections)
         print(f"  Updated: {target_path}")
 
     return target_path
@@ -183,6 +285,11 @@ def main() -> None:
         action="store_true",
         help="Show changes without applying"
     )
+    parser.add_argument(
+        "--use-mirror",
+        action="store_true",
+        help=f"Reuse objects from a local mirror under {CACHE_DIR}"
+    )
     args = parser.parse_args()
 
     print("=" * 60)
@@ -191,7 +298,7 @@ def main() -> None:
 
     # 一時ディレクトリにクローン
     with tempfile.TemporaryDirectory() as tmp_dir:
-        source_dir = clone_upstream(Path(tmp_dir) / "amplifier-core")
+        source_dir = clone_upstream(Path(tmp_dir) / "amplifier-core", use_mirror=args.use_mirror)
 
         print("\n[1/2] Syncing amplifier-philosophy...")
         sync_philosophy(source_dir, dry_run=args.dry_run)
@@ -9,16 +9,28 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import functools
+import os
 import re
 import shutil
 import subprocess
 import tempfile
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # === 設定 ===
 SOURCE_REPO = "https://github.com/robotdad/amplifier-collection-ddd"
+# 同期で参照する上流のパス（これ以外はチェックアウトしない）
+SOURCE_PATHS = ["agents", "context"]
 PLUGIN_ROOT = Path(__file__).parent.parent
 
+# 上流リポジトリのミラーを保持するキャッシュディレクトリ
+CACHE_DIR = Path.home() / ".cache" / "amplifier-skills-plugin"
+
+# context/ コピー時の並列ワーカー数
+MAX_WORKERS = 8
+
 # エージェント → コマンド マッピング (フラット構造)
 AGENT_TO_COMMAND = {
     "planning-architect.md": "ddd-1-plan.md",
@@ -28,15 +40,21 @@ AGENT_TO_COMMAND = {
     "finalization-specialist.md": "ddd-5-finish.md",
 }
 
-# 参照パス変換ルール
-REFERENCE_PATTERNS = [
-    (r"@ddd:context/", "@skills/ddd-guide/references/"),
-    (r"@ddd:", "@skills/ddd-guide/references/"),
-    (r"@foundation:IMPLEMENTATION_PHILOSOPHY\.md", "@skills/amplifier-philosophy/SKILL.md"),
-    (r"@foundation:MODULAR_DESIGN_PHILOSOPHY\.md", "@skills/amplifier-philosophy/SKILL.md"),
-    (r"@foundation:", "@skills/amplifier-philosophy/"),
+# 参照パス変換ルール（固定文字列。上から順に置換するため、より具体的なものを先に置く）
+REFERENCE_REPLACEMENTS = [
+    ("@ddd:context/", "@skills/ddd-guide/references/"),
+    ("@ddd:", "@skills/ddd-guide/references/"),
+    ("@foundation:IMPLEMENTATION_PHILOSOPHY.md", "@skills/amplifier-philosophy/SKILL.md"),
+    ("@foundation:MODULAR_DESIGN_PHILOSOPHY.md", "@skills/amplifier-philosophy/SKILL.md"),
+    ("@foundation:", "@skills/amplifier-philosophy/"),
 ]
 
+# 参照変換ルールが反応しうる接頭辞（これを含まないファイルは変換不要）
+REFERENCE_MARKERS = ("@ddd:", "@foundation:")
+REFERENCE_MARKER_BYTES = tuple(marker.encode("utf-8") for marker in REFERENCE_MARKERS)
+
+_NAME_RE = re.compile(r"^name:\s*.*$", re.MULTILINE)
+
 CREDIT_COMMENT = """\
 <!--
   Source: https://github.com/robotdad/amplifier-collection-ddd
@@ -45,6 +63,7 @@ CREDIT_COMMENT = """\
 -->
 
 """
+CREDIT_COMMENT_BYTES = CREDIT_COMMENT.encode("utf-8")
 
 SKILL_MD_TEMPLATE = """\
 ---
@@ -138,36 +157,94 @@ See `@skills/ddd-guide/references/` for detailed documentation:
 """
 
 
-def clone_upstream(target_dir: Path) -> Path:
-    """ソースリポジトリをクローン"""
+def ensure_mirror(url: str) -> Path | None:
+    """ローカルのミラーを作成・更新（失敗した場合は None を返し、ミラーなしでクローンさせる）"""
+    mirror_dir = CACHE_DIR / f"{url.rstrip('/').rsplit('/', 1)[-1]}.git"
+    try:
+        if mirror_dir.exists():
+            print(f"Updating mirror {mirror_dir}...")
+            subprocess.run(
+                ["git", "--git-dir", str(mirror_dir), "remote", "update", "--prune"],
+                check=True,
+                capture_output=True,
+            )
+        else:
+            print(f"Creating mirror {mirror_dir}...")
+            mirror_dir.parent.mkdir(parents=True, exist_ok=True)
+            subprocess.run(
+                ["git", "clone", "--mirror", url, str(mirror_dir)],
+                check=True,
+                capture_output=True,
+            )
+    except subprocess.CalledProcessError as e:
+        print(f"  WARNING: Mirror update failed, cloning without it: {e.stderr.decode().strip()}")
+        print(f"  (Delete {mirror_dir} if this keeps happening)")
+        return None
+    return mirror_dir
+
+
+def clone_upstream(target_dir: Path, use_mirror: bool = False) -> Path:
+    """ソースリポジトリをクローン（use_mirror=True ならローカルミラーのオブジェクトを再利用）"""
+    mirror_dir = ensure_mirror(SOURCE_REPO) if use_mirror else None
+    reference_args = ["--reference-if-able", str(mirror_dir)] if mirror_dir else []
     print(f"Cloning {SOURCE_REPO}...")
     subprocess.run(
-        ["git", "clone", "--depth", "1", SOURCE_REPO, str(target_dir)],
+        [
+            "git", "clone",
+            "--depth", "1",
+            "--single-branch",
+            "--no-tags",
+            "--filter=tree:0",
+            *reference_args,
+            "--sparse",
+            "--no-checkout",
+            SOURCE_REPO, str(target_dir),
+        ],
         check=True,
         capture_output=True,
     )
+    # sparse-checkout で同期に必要なパスだけを展開（それ以外のツリー・blobは取得しない）
+    for command in (["sparse-checkout", "set", *SOURCE_PATHS], ["checkout"]):
+        subprocess.run(
+            ["git", "-C", str(target_dir), *command],
+            check=True,
+            capture_output=True,
+        )
     return target_dir
 
 
+@functools.lru_cache(maxsize=512)
 def transform_references(content: str) -> str:
-    """参照パスを変換"""
-    result = content
-    for pattern, replacement in REFERENCE_PATTERNS:
-        result = re.sub(pattern, replacement, result)
-    return result
+    """参照パスを変換（同一内容の再変換はキャッシュから返す）"""
+    if not any(marker in content for marker in REFERENCE_MARKERS):
+        return content
+    for old, new in REFERENCE_REPLACEMENTS:
+        content = content.replace(old, new)
+    return content
 
 
 def inject_credit(content: str) -> str:
     """クレジット表記を追加"""
     # YAMLフロントマターがある場合はその後に挿入
     if content.startswith("---"):
-        parts = content.split("---", 2)
-        if len(parts) >= 3:
-            return f"---{parts[1]}---\n\n{CREDIT_COMMENT}{parts[2].lstrip()}"
+        # 閉じ側の --- の位置だけを探し、本文全体を split しない
+        end = content.find("---", 3)
+        if end != -1:
+            close = end + len("---")
+            return content[:close] + "\n\n" + CREDIT_COMMENT + content[close:].lstrip()
     # フロントマターがない場合は先頭に追加
     return CREDIT_COMMENT + content
 
 
+def needs_text_processing(raw: bytes) -> bool:
+    """参照変換・フロントマター処理・改行正規化のいずれかが必要か判定"""
+    return (
+        any(marker in raw for marker in REFERENCE_MARKER_BYTES)
+        or raw.startswith(b"---")
+        or b"\r" in raw
+    )
+
+
 def update_frontmatter_name(content: str, new_name: str) -> str:
     """フロントマターのname:フィールドを更新"""
     if not content.startswith("---"):
@@ -179,11 +256,34 @@ def update_frontmatter_name(content: str, new_name: str) -> str:
 
     frontmatter = parts[1]
     # name: を置換
-    frontmatter = re.sub(r"^name:\s*.*$", f"name: {new_name}", frontmatter, flags=re.MULTILINE)
+    frontmatter = _NAME_RE.sub(f"name: {new_name}", frontmatter)
 
     return f"---{frontmatter}---{parts[2]}"
 
 
+def _write_bytes(path: Path, data: bytes) -> None:
+    """os.open/os.write で直接書き込み（TextIOWrapper を経由しない）"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    """既存ファイルと内容が異なる場合のみ書き込み、書き込んだかどうかを返す"""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    _write_bytes(path, data)
+    return True
+
+
 def convert_agents_to_commands(source_dir: Path, dry_run: bool = False) -> list[Path]:
     """agents/ → commands/ に変換（フラット構造）"""
     agents_dir = source_dir / "agents"
@@ -192,15 +292,19 @@ def convert_agents_to_commands(source_dir: Path, dry_run: bool = False) -> list[
     if not agents_dir.exists():
         raise FileNotFoundError(f"agents directory not found: {agents_dir}")
 
+    # ディレクトリ一覧を一度だけ取得し、ファイルごとの stat を避ける
+    with os.scandir(agents_dir) as entries:
+        available = {entry.name for entry in entries}
+
     converted = []
     for agent_file, command_file in AGENT_TO_COMMAND.items():
+        if agent_file not in available:
+            print(f"  WARNING: {agents_dir / agent_file} not found, skipping")
+            continue
+
         source_path = agents_dir / agent_file
         target_path = commands_dir / command_file
 
-        if not source_path.exists():
-            print(f"  WARNING: {source_path} not found, skipping")
-            continue
-
         content = source_path.read_text()
         content = transform_references(content)
         content = inject_credit(content)
@@ -213,7 +317,7 @@ def convert_agents_to_commands(source_dir: Path, dry_run: bool = False) -> list[
             print(f"  [DRY-RUN] Would create: {target_path}")
         else:
             target_path.parent.mkdir(parents=True, exist_ok=True)
-            target_path.write_text(content)
+            _write_bytes(target_path, content.encode("utf-8"))
             print(f"  Created: {target_path}")
 
         converted.append(target_path)
@@ -221,6 +325,19 @@ def convert_agents_to_commands(source_dir: Path, dry_run: bool = False) -> list[
     return converted
 
 
+def _walk_md(root: str | Path, relative_dir: str = "") -> Iterator[tuple[str, str]]:
+    """root 配下の .md ファイルを (パス, root からの相対パス) として列挙"""
+    # DirEntry が readdir 時点で持つ種別情報を使い、エントリごとの stat を避ける
+    # rglob と同様に、シンボリックリンクのディレクトリには降りず、リンク先がファイルの .md は含める
+    with os.scandir(root) as entries:
+        for entry in entries:
+            relative_path = os.path.join(relative_dir, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_md(entry.path, relative_path)
+            elif entry.name.endswith(".md") and entry.is_file():
+                yield entry.path, relative_path
+
+
 def copy_context_to_skills(source_dir: Path, dry_run: bool = False) -> list[Path]:
     """context/ → skills/ddd-guide/references/ にコピー"""
     context_dir = source_dir / "context"
@@ -229,22 +346,49 @@ def copy_context_to_skills(source_dir: Path, dry_run: bool = False) -> list[Path
     if not context_dir.exists():
         raise FileNotFoundError(f"context directory not found: {context_dir}")
 
-    copied = []
-    for md_file in context_dir.rglob("*.md"):
-        relative_path = md_file.relative_to(context_dir)
+    def process_one(md_file: tuple[str, str]) -> tuple[Path, bool]:
+        source_path, relative_path = md_file
         target_path = references_dir / relative_path
 
-        content = md_file.read_text()
-        content = transform_references(content)
-        content = inject_credit(content)
+        with open(source_path, "rb") as f:
+            raw = f.read()
+        if needs_text_processing(raw):
+            # 改行は read_text() と同様にユニバーサル改行として正規化
+            content = raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            content = transform_references(content)
+            content = inject_credit(content)
+            data = content.encode("utf-8")
+        else:
+            # 変換対象がなければ再エンコードせずにクレジットだけ付与
+            # （不正な UTF-8 はテキスト経路と同様にエラーにするため、デコードによる検証だけは行う）
+            raw.decode("utf-8")
+            data = CREDIT_COMMENT_BYTES + raw
+
+        if dry_run:
+            return target_path, True
+
+        return target_path, _write_if_changed(target_path, data)
 
+    md_files = list(_walk_md(context_dir))
+
+    # 出力先ディレクトリはファイルごとではなく、重複を除いて一度ずつ作成
+    if not dry_run:
+        parents = {(references_dir / relative_path).parent for _, relative_path in md_files}
+        for parent in parents:
+            parent.mkdir(parents=True, exist_ok=True)
+
+    # ファイルごとの処理は独立しているのでスレッドプールで並列化（出力は元の順序で表示）
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(process_one, md_files))
+
+    copied = []
+    for target_path, written in results:
         if dry_run:
             print(f"  [DRY-RUN] Would create: {target_path}")
-        else:
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            target_path.write_text(content)
+        elif written:
             print(f"  Created: {target_path}")
-
+        else:
+            print(f"  Unchanged: {target_path}")
         copied.append(target_path)
 
     return copied
@@ -258,7 +402,7 @@ def generate_skill_md(dry_run: bool = False) -> Path:
         print(f"  [DRY-RUN] Would create: {skill_path}")
     else:
         skill_path.parent.mkdir(parents=True, exist_ok=True)
-        skill_path.write_text(SKILL_MD_TEMPLATE)
+        _write_bytes(skill_path, SKILL_MD_TEMPLATE.encode("utf-8"))
         print(f"  Created: {skill_path}")
 
     return skill_path
@@ -267,6 +411,9 @@ def generate_skill_md(dry_run: bool = False) -> Path:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Sync DDD collection to amplifier-skills-plugin")
     parser.add_argument("--dry-run", action="store_true", help="Show changes without applying")
+    parser.add_argument(
+        "--use-mirror", action="store_true", help=f"Reuse objects from a local mirror under {CACHE_DIR}"
+    )
     args = parser.parse_args()
 
     print("=" * 60)
@@ -275,7 +422,7 @@ def main() -> None:
 
     # 一時ディレクトリにクローン
     with tempfile.TemporaryDirectory() as tmp_dir:
-        source_dir = clone_upstream(Path(tmp_dir) / "ddd")
+        source_dir = clone_upstream(Path(tmp_dir) / "ddd", use_mirror=args.use_mirror)
 
         print("\n[1/3] Converting agents to commands...")
         convert_agents_to_commands(source_dir, dry_run=args.dry_run)